@@ -1,4 +1,5 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import asyncio
 import os
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
@@ -9,6 +10,8 @@ load_dotenv()
 from ..rag.faq_rag import FAQRAG
 from ..tools.availability_tool import AvailabilityTool
 from ..tools.booking_tool import BookingTool
+from ..jobs.queue import JobQueue
+from ..jobs.post_booking import enqueue_post_booking
 from ..models.schemas import (
     ChatRequest,
     ChatResponse,
@@ -33,10 +36,13 @@ class SchedulingAgent:
         faq_rag: FAQRAG,
         availability_tool: AvailabilityTool,
         booking_tool: BookingTool,
+        job_queue: Optional[JobQueue] = None,
     ):
         self.faq_rag = faq_rag
         self.availability_tool = availability_tool
         self.booking_tool = booking_tool
+        # Post-booking side effects (emails, reminders, audit) run off the request path
+        self.job_queue = job_queue
 
     async def _call_llm(self, messages):
         """Call OpenAI LLM with fallback to mock responses."""
@@ -183,6 +189,13 @@ class SchedulingAgent:
             reason=reason,
         )
         booking_resp = await self.booking_tool.book(booking_req)
+        if self.job_queue is not None:
+            try:
+                # SQLite write runs off the event loop so lock waits don't stall other requests
+                await asyncio.to_thread(enqueue_post_booking, self.job_queue, booking_resp)
+            except Exception as e:
+                # The slot is reserved either way; don't fail the booking over its notifications
+                print(f"Failed to queue post-booking jobs for {booking_resp.booking_id}: {e}")
         text = (
             f"Your appointment is confirmed!\n\n"
             f"- Type: {booking_resp.details['appointment_type']}\n"
@@ -1,17 +1,35 @@
+import json
 import random
-from datetime import datetime, timedelta
-from typing import List
+import re
+from datetime import datetime, time, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import ValidationError
 from ..models.schemas import (
     AvailabilityResponse,
     AvailabilitySlot,
     BookingRequest,
     BookingResponse,
+    CalendlyWebhook,
 )
+from ..sync.mirror import BusyInterval, parse_date
+from ..sync.webhook import BOOKING_EVENTS, SIGNATURE_HEADER, verify_webhook_signature
+from ..sync.worker import CalendlySyncWorker
 
 router = APIRouter(prefix="/api/calendly", tags=["calendly"])
 
+# Background sync worker - set by main.py when the real Calendly integration is enabled
+_sync_worker: Optional[CalendlySyncWorker] = None
+_webhook_signing_key: Optional[str] = None
+
+
+def set_sync_worker(worker: Optional[CalendlySyncWorker], webhook_signing_key: Optional[str] = None):
+    """Serve availability from the worker's local mirror instead of mock data"""
+    global _sync_worker, _webhook_signing_key
+    _sync_worker = worker
+    _webhook_signing_key = webhook_signing_key
+
 
 def generate_mock_slots(date: str, duration_minutes: int) -> List[AvailabilitySlot]:
     # Simple fixed working hours: 9:00–17:00
@@ -37,6 +55,19 @@ def generate_mock_slots(date: str, duration_minutes: int) -> List[AvailabilitySl
     return slots
 
 
+def build_slots_from_busy(date: str, duration_minutes: int, busy: List[BusyInterval]) -> List[AvailabilitySlot]:
+    slots = generate_mock_slots(date, duration_minutes)
+    dt_date = datetime.fromisoformat(date)
+
+    for slot in slots:
+        hour, minute = map(int, slot.start_time.split(":"))
+        start = dt_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        end = start + timedelta(minutes=duration_minutes)
+        slot.available = not any(start < b_end and b_start < end for b_start, b_end in busy)
+
+    return slots
+
+
 APPOINTMENT_DURATIONS = {
     "general_consultation": 30,
     "followup": 15,
@@ -45,6 +76,24 @@ APPOINTMENT_DURATIONS = {
 }
 
 
+async def _mirror_busy_on(appointment_type: str, date: str) -> List[BusyInterval]:
+    """Busy intervals from the sync worker's mirror, refreshed if stale."""
+    try:
+        in_window = _sync_worker.covers(date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date, expected YYYY-MM-DD")
+    if not in_window:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Availability is only known for the next {_sync_worker.window_days} days",
+        )
+    try:
+        await _sync_worker.ensure_fresh(appointment_type)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Calendly availability unavailable: {e}")
+    return _sync_worker.mirror.busy_on(appointment_type, date)
+
+
 @router.get("/availability", response_model=AvailabilityResponse)
 async def get_availability(
     date: str = Query(..., example="2024-01-15"),
@@ -54,7 +103,11 @@ async def get_availability(
         raise HTTPException(status_code=400, detail="Unsupported appointment type")
 
     duration = APPOINTMENT_DURATIONS[appointment_type]
-    slots = generate_mock_slots(date, duration_minutes=duration)
+    if _sync_worker is None:
+        slots = generate_mock_slots(date, duration_minutes=duration)
+    else:
+        busy = await _mirror_busy_on(appointment_type, date)
+        slots = build_slots_from_busy(date, duration, busy)
 
     return AvailabilityResponse(
         date=date,
@@ -63,8 +116,57 @@ async def get_availability(
     )
 
 
+@router.post("/webhook")
+async def calendly_webhook(request: Request):
+    # Calendly change notifications keep the local availability mirror current
+    if _sync_worker is None:
+        return {"status": "ignored"}
+    if not _webhook_signing_key:
+        raise HTTPException(status_code=503, detail="Calendly webhook signing key not configured")
+
+    body = await request.body()
+    if not verify_webhook_signature(body, request.headers.get(SIGNATURE_HEADER), _webhook_signing_key):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not valid JSON")
+    if not isinstance(data, dict) or data.get("event") not in BOOKING_EVENTS:
+        return {"status": "ignored"}
+    try:
+        notification = CalendlyWebhook.model_validate(data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    applied = _sync_worker.handle_webhook(notification)
+    return {"status": "applied" if applied else "ignored"}
+
+
+async def _reserve_in_mirror(payload: BookingRequest):
+    """Refuse slots the mirror knows are taken and mark the new one busy right away."""
+    if payload.appointment_type not in APPOINTMENT_DURATIONS:
+        raise HTTPException(status_code=400, detail="Unsupported appointment type")
+    try:
+        if not re.fullmatch(r"\d{2}:\d{2}", payload.start_time):
+            raise ValueError(payload.start_time)
+        start = datetime.combine(parse_date(payload.date), time.fromisoformat(payload.start_time))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date or start_time")
+    end = start + timedelta(minutes=APPOINTMENT_DURATIONS[payload.appointment_type])
+
+    busy = await _mirror_busy_on(payload.appointment_type, payload.date)
+    if any(start < b_end and b_start < end for b_start, b_end in busy):
+        raise HTTPException(status_code=409, detail="Slot is no longer available")
+    # Kept as a local overlay until upstream reports the booking or it has ended
+    _sync_worker.record_booking(payload.appointment_type, start, end)
+
+
 @router.post("/book", response_model=BookingResponse)
 async def book_appointment(payload: BookingRequest):
+    if _sync_worker is not None:
+        await _reserve_in_mirror(payload)
+
     # In real integration, call Calendly API here
     booking_id = f"APPT-{random.randint(1000, 9999)}"
     confirmation_code = f"CONF-{random.randint(100000, 999999)}"
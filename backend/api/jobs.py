@@ -0,0 +1,26 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from ..models.schemas import QueueMetrics
+from ..jobs.queue import JobQueue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# Global reference to the job queue - will be set by main.py
+_job_queue: JobQueue = None
+
+
+def get_job_queue() -> JobQueue:
+    if _job_queue is None:
+        raise RuntimeError("Job queue not initialized")
+    return _job_queue
+
+
+def set_job_queue(queue: JobQueue):
+    """Set the global job queue from main.py"""
+    global _job_queue
+    _job_queue = queue
+
+
+@router.get("/metrics", response_model=QueueMetrics)
+async def queue_metrics(queue: JobQueue = Depends(get_job_queue)):
+    return await asyncio.to_thread(queue.metrics)
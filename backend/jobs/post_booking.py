@@ -0,0 +1,80 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from ..models.schemas import BookingResponse, Job
+from .queue import JobQueue
+from .worker import JobWorkerPool
+
+SEND_CONFIRMATION = "send_confirmation"
+SEND_REMINDER = "send_reminder"
+AUDIT_LOG = "audit_log"
+
+REMINDER_LEAD = timedelta(hours=24)
+
+
+class ConsoleNotifier:
+    """
+    Stand-in for an email/SMS provider; sends a whole batch in one call.
+    Swap for a real provider client with the same `send_batch` method.
+    """
+
+    async def send_batch(self, messages: List[Dict[str, Any]]):
+        for m in messages:
+            print(f"[notify] {m['template']} -> {m['to']} ({m['confirmation_code']})")
+
+
+class AuditLog:
+    """Append-only JSON lines file of booking events."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    async def write_batch(self, entries: List[Dict[str, Any]]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in entries))
+
+
+def enqueue_post_booking(queue: JobQueue, booking: BookingResponse, timezone: Optional[str] = None) -> List[int]:
+    """
+    Queue the side effects of a confirmed booking; cheap enough for the request path.
+    Booking date/start_time are clinic-local, in `timezone` (defaults to TIMEZONE).
+    """
+    details = booking.details
+    message = {
+        "to": details["patient"]["email"],
+        "booking_id": booking.booking_id,
+        "confirmation_code": booking.confirmation_code,
+        "appointment_type": details["appointment_type"],
+        "date": details["date"],
+        "start_time": details["start_time"],
+    }
+    jobs = [
+        (SEND_CONFIRMATION, {**message, "template": "confirmation"}, 0.0),
+        (AUDIT_LOG, {"event": "booking.confirmed", "booking_id": booking.booking_id, "details": details}, 0.0),
+    ]
+
+    appointment_at = datetime.fromisoformat(f"{details['date']}T{details['start_time']}")
+    now = datetime.now(ZoneInfo(timezone or os.getenv("TIMEZONE", "America/New_York"))).replace(tzinfo=None)
+    reminder_delay = (appointment_at - REMINDER_LEAD - now).total_seconds()
+    # Bookings made less than a day ahead only get the confirmation
+    if reminder_delay > 0:
+        jobs.append((SEND_REMINDER, {**message, "template": "reminder"}, reminder_delay))
+
+    return queue.enqueue_many(jobs)
+
+
+def register_post_booking_handlers(pool: JobWorkerPool, notifier, audit_log: AuditLog, batch_size: int = 50):
+    async def send_notifications(jobs: List[Job]):
+        await notifier.send_batch([job.payload for job in jobs])
+
+    async def write_audit(jobs: List[Job]):
+        await audit_log.write_batch([{"job_id": job.id, **job.payload} for job in jobs])
+
+    pool.register(SEND_CONFIRMATION, send_notifications, batch_size=batch_size)
+    pool.register(SEND_REMINDER, send_notifications, batch_size=batch_size)
+    pool.register(AUDIT_LOG, write_audit, batch_size=batch_size)
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from ..models.schemas import Job, QueueMetrics
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs (status, run_at);
+"""
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file.
+    Jobs move pending -> running -> done, or back to pending with a later
+    run_at on failure, until max_attempts is reached and they are marked failed.
+
+    Methods block (and may wait up to `busy_timeout` for another process's
+    write lock), so async callers should run them via asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, busy_timeout: float = 1.0):
+        self.path = path
+        self._clock = clock
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Autocommit mode; multi-statement changes use explicit BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], delay: float = 0.0, max_attempts: int = 5) -> int:
+        return self.enqueue_many([(kind, payload, delay)], max_attempts=max_attempts)[0]
+
+    def enqueue_many(self, jobs: List[Tuple[str, Dict[str, Any], float]], max_attempts: int = 5) -> List[int]:
+        """Insert (kind, payload, delay) jobs in one transaction."""
+        now = self._clock()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for kind, payload, delay in jobs:
+                    cur = self._conn.execute(
+                        "INSERT INTO jobs (kind, payload, max_attempts, run_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (kind, json.dumps(payload), max_attempts, now + delay, now),
+                    )
+                    ids.append(cur.lastrowid)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def claim_batch(self, batch_sizes: Dict[str, int]) -> List[Job]:
+        """
+        Claim the oldest due job of a known kind plus up to batch_size - 1 more
+        due jobs of the same kind. Returns [] when nothing is due.
+        """
+        if not batch_sizes:
+            return []
+        now = self._clock()
+        kinds = list(batch_sizes)
+        placeholders = ",".join("?" * len(kinds))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT kind FROM jobs WHERE status = 'pending' AND run_at <= ? AND attempts < max_attempts "
+                    f"AND kind IN ({placeholders}) "
+                    "ORDER BY run_at, id LIMIT 1",
+                    (now, *kinds),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return []
+                kind = row[0]
+                rows = self._conn.execute(
+                    "SELECT id, kind, payload, attempts, max_attempts FROM jobs "
+                    "WHERE status = 'pending' AND run_at <= ? AND attempts < max_attempts AND kind = ? "
+                    "ORDER BY run_at, id LIMIT ?",
+                    (now, kind, max(1, batch_sizes[kind])),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(now, r[0]) for r in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            Job(id=r[0], kind=r[1], payload=json.loads(r[2]), attempts=r[3] + 1, max_attempts=r[4])
+            for r in rows
+        ]
+
+    def complete(self, job_ids: List[int]):
+        now = self._clock()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'done', updated_at = ? WHERE id = ?",
+                [(now, job_id) for job_id in job_ids],
+            )
+
+    def fail(self, job: Job, error: str, retry_delay: float) -> bool:
+        """Schedule a retry after `retry_delay`; returns False once the job is given up on."""
+        now = self._clock()
+        retry = job.attempts < job.max_attempts
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, updated_at = ?, last_error = ? WHERE id = ?",
+                ("pending" if retry else "failed", now + retry_delay, now, error, job.id),
+            )
+        return retry
+
+    def release(self, job_ids: List[int]):
+        """Hand claimed jobs back untouched (worker shutting down); the attempt is not counted."""
+        now = self._clock()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'pending', attempts = attempts - 1, updated_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                [(now, job_id) for job_id in job_ids],
+            )
+
+    def heartbeat(self, job_ids: List[int]):
+        """Mark running jobs as still alive so requeue_stale leaves them alone."""
+        now = self._clock()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = 'running'",
+                [(now, job_id) for job_id in job_ids],
+            )
+
+    def requeue_stale(self, timeout: float) -> int:
+        """
+        Return jobs left running by a crashed worker to the queue, or mark them
+        failed if they have used up their attempts. Returns the number requeued.
+        """
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', updated_at = ?, last_error = 'worker lost' "
+                    "WHERE status = 'running' AND updated_at < ? AND attempts >= max_attempts",
+                    (now, now - timeout),
+                )
+                cur = self._conn.execute(
+                    "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running' AND updated_at < ?",
+                    (now, now - timeout),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cur.rowcount
+
+    def metrics(self) -> QueueMetrics:
+        now = self._clock()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            by_kind = dict(
+                self._conn.execute("SELECT kind, COUNT(*) FROM jobs WHERE status = 'pending' GROUP BY kind").fetchall()
+            )
+            due, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(run_at) FROM jobs WHERE status = 'pending' AND run_at <= ?",
+                (now,),
+            ).fetchone()
+        return QueueMetrics(
+            pending=counts.get("pending", 0),
+            running=counts.get("running", 0),
+            done=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+            due=due,
+            oldest_due_age_seconds=now - oldest if oldest is not None else 0.0,
+            pending_by_kind=by_kind,
+        )
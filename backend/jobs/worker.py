@@ -0,0 +1,109 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..models.schemas import Job
+from .queue import JobQueue
+
+JobHandler = Callable[[List[Job]], Awaitable[None]]
+
+
+class JobWorkerPool:
+    """
+    Runs `concurrency` workers that claim batches from a JobQueue and pass
+    them to the handler registered for their kind. A failing batch is retried
+    job by job with exponential backoff (base_backoff * 2^(attempt-1), capped).
+    A handler running longer than `handler_timeout` counts as a failure; while
+    it runs, its jobs are heartbeated so `stale_timeout` only catches dead workers.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        base_backoff: float = 5.0,
+        max_backoff: float = 600.0,
+        stale_timeout: float = 300.0,
+        handler_timeout: float = 120.0,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.stale_timeout = stale_timeout
+        self.handler_timeout = handler_timeout
+        self._handlers: Dict[str, JobHandler] = {}
+        self._batch_sizes: Dict[str, int] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler, batch_size: int = 1):
+        self._handlers[kind] = handler
+        self._batch_sizes[kind] = batch_size
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+
+    async def run_once(self) -> int:
+        """Claim and process one batch; returns the number of jobs handled."""
+        jobs = await asyncio.to_thread(self.queue.claim_batch, self._batch_sizes)
+        if not jobs:
+            return 0
+        heartbeat = asyncio.create_task(self._heartbeat([job.id for job in jobs]))
+        try:
+            await asyncio.wait_for(self._handlers[jobs[0].kind](jobs), self.handler_timeout)
+        except asyncio.CancelledError:
+            # Pool is stopping mid-batch: make the jobs claimable again right away
+            await asyncio.to_thread(self.queue.release, [job.id for job in jobs])
+            raise
+        except Exception as e:
+            error = f"handler timed out after {self.handler_timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            for job in jobs:
+                if not await asyncio.to_thread(self.queue.fail, job, error, self.backoff(job.attempts)):
+                    print(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+        else:
+            await asyncio.to_thread(self.queue.complete, [job.id for job in jobs])
+        finally:
+            heartbeat.cancel()
+        return len(jobs)
+
+    async def _heartbeat(self, job_ids: List[int]):
+        while True:
+            await asyncio.sleep(self.stale_timeout / 3)
+            await asyncio.to_thread(self.queue.heartbeat, job_ids)
+
+    async def drain(self, max_batches: Optional[int] = None) -> int:
+        """Process due jobs in the current task until none are left (used by tests)."""
+        handled = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = await self.run_once()
+            if not count:
+                break
+            handled += count
+            batches += 1
+        return handled
+
+    async def _worker(self):
+        while True:
+            try:
+                count = await self.run_once()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+                count = 0
+            if not count:
+                # Pick up jobs left running by a crashed or cancelled worker
+                await asyncio.to_thread(self.queue.requeue_stale, self.stale_timeout)
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel the workers; batches still in flight are released back to pending."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
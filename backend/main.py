@@ -9,11 +9,18 @@ load_dotenv()
 
 from .api import chat as chat_router_module
 from .api import calendly_integration
+from .api import jobs as jobs_router_module
 from .agent.scheduling_agent import SchedulingAgent
 from .rag.vector_store import SimpleVectorStore
 from .rag.faq_rag import FAQRAG
 from .tools.availability_tool import AvailabilityTool
 from .tools.booking_tool import BookingTool
+from .sync.client import CalendlyClient
+from .sync.mirror import AvailabilityMirror
+from .sync.worker import CalendlySyncWorker
+from .jobs.queue import JobQueue
+from .jobs.worker import JobWorkerPool
+from .jobs.post_booking import AuditLog, ConsoleNotifier, register_post_booking_handlers
 
 
 app = FastAPI(title="Medical Appointment Scheduling Agent")
@@ -41,11 +48,61 @@ agent_instance = SchedulingAgent(
     booking_tool=booking_tool,
 )
 
+# Durable queue + workers for post-booking side effects; opened on startup
+# so that importing the app does not create files
+job_queue = None
+job_pool = None
+
+# Local Calendly availability mirror (only used when mock Calendly is off)
+use_mock_calendly = os.getenv("USE_MOCK_CALENDLY", "true").lower() == "true"
+calendly_sync_url = os.getenv("CALENDLY_SYNC_URL")
+sync_worker = None
+if not use_mock_calendly and not calendly_sync_url:
+    print("Warning: CALENDLY_SYNC_URL not set, using mock Calendly availability")
+elif not use_mock_calendly:
+    sync_worker = CalendlySyncWorker(
+        client=CalendlyClient(
+            base_url=calendly_sync_url,
+            api_key=os.getenv("CALENDLY_API_KEY"),
+        ),
+        mirror=AvailabilityMirror(timezone=os.getenv("TIMEZONE", "America/New_York")),
+        event_types=list(calendly_integration.APPOINTMENT_DURATIONS),
+        reconcile_interval=float(os.getenv("CALENDLY_SYNC_INTERVAL_SECONDS", "300")),
+        max_staleness=float(os.getenv("CALENDLY_MAX_STALENESS_SECONDS", "900")),
+    )
+    calendly_integration.set_sync_worker(sync_worker, webhook_signing_key=os.getenv("CALENDLY_WEBHOOK_SIGNING_KEY"))
+
+
+def start_job_queue():
+    global job_queue, job_pool
+    job_queue = JobQueue(path=os.getenv("JOB_QUEUE_PATH", os.path.join("data", "jobs.db")))
+    job_pool = JobWorkerPool(queue=job_queue, concurrency=int(os.getenv("JOB_WORKERS", "4")))
+    register_post_booking_handlers(
+        job_pool,
+        notifier=ConsoleNotifier(),
+        audit_log=AuditLog(path=os.getenv("AUDIT_LOG_PATH", os.path.join("data", "audit.log"))),
+    )
+    agent_instance.job_queue = job_queue
+    jobs_router_module.set_job_queue(job_queue)
+    job_pool.start()
+
 
 @app.on_event("startup")
 async def startup_event():
     # Preload RAG data
     await faq_store.load()
+    start_job_queue()
+    if sync_worker is not None:
+        sync_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if sync_worker is not None:
+        await sync_worker.stop()
+    if job_pool is not None:
+        await job_pool.stop()
+        job_queue.close()
 
 
 def get_agent() -> SchedulingAgent:
@@ -62,6 +119,7 @@ chat_router_module.set_agent(agent_instance)
 # Now include the router
 app.include_router(chat_router_module.router)
 app.include_router(calendly_integration.router)
+app.include_router(jobs_router_module.router)
 
 
 @app.get("/")
@@ -1,5 +1,6 @@
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, EmailStr, model_validator
 
 
 class Message(BaseModel):
@@ -52,3 +53,39 @@ class BookingResponse(BaseModel):
     status: str
     confirmation_code: str
     details: dict
+
+
+class CalendlyWebhookPayload(BaseModel):
+    # Simplified stand-in shape; see backend/sync/client.py
+    event_type: str
+    start_time: datetime
+    end_time: datetime
+
+    @model_validator(mode="after")
+    def check_order(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class CalendlyWebhook(BaseModel):
+    event: str  # "invitee.created" or "invitee.canceled"
+    payload: CalendlyWebhookPayload
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+class QueueMetrics(BaseModel):
+    pending: int
+    running: int
+    done: int
+    failed: int
+    due: int  # pending jobs whose run_at has passed
+    oldest_due_age_seconds: float
+    pending_by_kind: Dict[str, int]
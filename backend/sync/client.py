@@ -0,0 +1,46 @@
+from typing import List, Optional, Tuple
+import httpx
+
+
+class CalendlyClient:
+    """
+    Thin async client for a busy-times service.
+
+    This is NOT the public Calendly API (which has no per-event-type busy
+    endpoint and limits user_busy_times to 7-day ranges). It targets a
+    stand-in contract that an adapter service in front of Calendly must
+    implement (none ships with this repo):
+
+        GET {base_url}/event_type_busy_times?event_type=<name>&start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+        -> {"collection": [{"start_time": "<ISO 8601>", "end_time": "<ISO 8601>"}, ...]}
+
+    `event_type` is our appointment type name (e.g. "general_consultation").
+    `transport` lets tests plug in LocalCalendlyServer, an in-process httpx
+    transport rather than a server that `base_url` could point at.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.transport = transport
+
+    async def fetch_busy_times(self, event_type: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """Busy (start_time, end_time) ISO strings as returned upstream, usually UTC."""
+        url = f"{self.base_url}/event_type_busy_times"
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            resp = await client.get(
+                url,
+                params={"event_type": event_type, "start_date": start_date, "end_date": end_date},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+        return [(item["start_time"], item["end_time"]) for item in data["collection"]]
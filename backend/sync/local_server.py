@@ -0,0 +1,84 @@
+import asyncio
+import json
+import random
+from typing import Any, Dict, Optional, Set, Tuple
+import httpx
+
+from .webhook import SIGNATURE_HEADER, sign_webhook
+
+
+class LocalCalendlyServer:
+    """
+    Test-only, in-process stand-in for the busy-times contract of CalendlyClient.
+    It is an httpx transport, not a network server: hand it to CalendlyClient
+    via `transport()`; nothing listens on a port. `latency`, `failure_rate`
+    and `fail_next` inject slow or failing upstream responses.
+    `book` / `cancel` mutate its state and return the webhook notification
+    Calendly would send, so tests can deliver (or drop) it themselves;
+    `sign` produces the body and headers of a signed delivery.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+        signing_key: str = "local-signing-key",
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.busy: Dict[str, Set[Tuple[str, str]]] = {}
+        self.request_count = 0
+        self._fail_next = 0
+        self._rng = random.Random(seed)
+        self.signing_key = signing_key
+
+    def fail_next(self, count: int = 1):
+        self._fail_next += count
+
+    def book(self, event_type: str, start_time: str, end_time: str) -> Dict[str, Any]:
+        self.busy.setdefault(event_type, set()).add((start_time, end_time))
+        return self._notification("invitee.created", event_type, start_time, end_time)
+
+    def cancel(self, event_type: str, start_time: str, end_time: str) -> Dict[str, Any]:
+        self.busy.get(event_type, set()).discard((start_time, end_time))
+        return self._notification("invitee.canceled", event_type, start_time, end_time)
+
+    @staticmethod
+    def _notification(event: str, event_type: str, start_time: str, end_time: str) -> Dict[str, Any]:
+        return {
+            "event": event,
+            "payload": {"event_type": event_type, "start_time": start_time, "end_time": end_time},
+        }
+
+    def sign(self, notification: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+        body = json.dumps(notification).encode()
+        headers = {SIGNATURE_HEADER: sign_webhook(body, self.signing_key), "Content-Type": "application/json"}
+        return body, headers
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.request_count += 1
+        response = self._respond(request)
+        # Delay after the snapshot is taken, like a slow network on the way back
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return response
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if self._fail_next > 0 or self._rng.random() < self.failure_rate:
+            self._fail_next = max(0, self._fail_next - 1)
+            return httpx.Response(503, json={"message": "Service Unavailable"})
+        if request.url.path != "/event_type_busy_times":
+            return httpx.Response(404, json={"message": "Not Found"})
+
+        params = request.url.params
+        start_date, end_date = params["start_date"], params["end_date"]
+        collection = [
+            {"start_time": start, "end_time": end}
+            for start, end in sorted(self.busy.get(params["event_type"], set()))
+            if start_date <= start[:10] <= end_date
+        ]
+        return httpx.Response(200, json={"collection": collection})
@@ -0,0 +1,99 @@
+import re
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from zoneinfo import ZoneInfo
+
+# (start, end) as naive clinic-local datetimes
+BusyInterval = Tuple[datetime, datetime]
+
+TimeValue = Union[str, datetime]
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_date(value: str) -> date:
+    """Strict YYYY-MM-DD; fromisoformat alone also accepts 20261020, 2026-W43-2, ..."""
+    if not _DATE_RE.fullmatch(value):
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+    return date.fromisoformat(value)
+
+
+def to_clinic_time(value: TimeValue, tz: tzinfo) -> datetime:
+    """
+    Convert an upstream timestamp (e.g. "2026-10-20T14:00:00.000000Z") to a naive
+    clinic-local datetime. Naive input is taken to be clinic-local already.
+    """
+    if isinstance(value, str):
+        # fromisoformat only accepts a trailing "Z" from Python 3.11 on
+        value = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    if value.tzinfo is not None:
+        value = value.astimezone(tz).replace(tzinfo=None)
+    return value
+
+
+class AvailabilityMirror:
+    """
+    Local copy of busy times per Calendly event type, in clinic-local time.
+    Kept up to date by CalendlySyncWorker; read by the availability endpoint
+    so that checking slots does not need an upstream call.
+
+    Bookings made through this service are kept in a separate overlay that
+    survives `replace`, until upstream reports them or they have ended.
+    """
+
+    def __init__(self, timezone: str = "UTC", clock: Callable[[], float] = time.monotonic):
+        self.tz = ZoneInfo(timezone)
+        self._clock = clock
+        self._busy: Dict[str, Set[BusyInterval]] = {}
+        self._local: Dict[str, Set[BusyInterval]] = {}
+        self._synced_at: Dict[str, float] = {}
+
+    def _interval(self, start: TimeValue, end: TimeValue) -> BusyInterval:
+        return (to_clinic_time(start, self.tz), to_clinic_time(end, self.tz))
+
+    def replace(self, event_type: str, intervals: List[Tuple[TimeValue, TimeValue]]):
+        """Full reconciliation: swap in the upstream view of an event type."""
+        busy = {self._interval(start, end) for start, end in intervals}
+        self._busy[event_type] = busy
+        self._synced_at[event_type] = self._clock()
+
+        now = datetime.now(self.tz).replace(tzinfo=None)
+        local = self._local.get(event_type, set())
+        self._local[event_type] = {i for i in local if i not in busy and i[1] > now}
+
+    def add_busy(self, event_type: str, start: TimeValue, end: TimeValue):
+        interval = self._interval(start, end)
+        self._busy.setdefault(event_type, set()).add(interval)
+        # Upstream now knows about it; no need to keep the local copy
+        self._local.get(event_type, set()).discard(interval)
+
+    def add_local_booking(self, event_type: str, start: TimeValue, end: TimeValue):
+        """Record a booking made here that upstream has not reported yet."""
+        self._local.setdefault(event_type, set()).add(self._interval(start, end))
+
+    def remove_busy(self, event_type: str, start: TimeValue, end: TimeValue):
+        interval = self._interval(start, end)
+        self._busy.get(event_type, set()).discard(interval)
+        self._local.get(event_type, set()).discard(interval)
+
+    def staleness(self, event_type: str) -> Optional[float]:
+        """Seconds since the last full reconciliation, or None if never synced."""
+        synced_at = self._synced_at.get(event_type)
+        if synced_at is None:
+            return None
+        return self._clock() - synced_at
+
+    def is_fresh(self, event_type: str, max_staleness: float) -> bool:
+        age = self.staleness(event_type)
+        return age is not None and age <= max_staleness
+
+    def busy_on(self, event_type: str, day: str) -> List[BusyInterval]:
+        """Busy intervals overlapping the given clinic-local YYYY-MM-DD date, sorted."""
+        day_start = datetime.combine(parse_date(day), datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+        return sorted(
+            (start, end)
+            for start, end in self._busy.get(event_type, set()) | self._local.get(event_type, set())
+            if start < day_end and day_start < end
+        )
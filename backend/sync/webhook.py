@@ -0,0 +1,40 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+# Header Calendly signs webhook deliveries with: "t=<unix timestamp>,v1=<hex hmac>"
+SIGNATURE_HEADER = "Calendly-Webhook-Signature"
+
+# Events that change busy times; anything else is acknowledged and ignored
+BOOKING_EVENTS = ("invitee.created", "invitee.canceled")
+
+
+def sign_webhook(body: bytes, signing_key: str, timestamp: Optional[int] = None) -> str:
+    """Build a signature header value for `body` (used by LocalCalendlyServer)."""
+    t = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(signing_key.encode(), f"{t}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={t},v1={digest}"
+
+
+def verify_webhook_signature(
+    body: bytes,
+    header: Optional[str],
+    signing_key: str,
+    tolerance: float = 180.0,
+    now: Optional[float] = None,
+) -> bool:
+    """Check an HMAC-SHA256 signature and reject deliveries older than `tolerance` seconds."""
+    if not header:
+        return False
+    parts = dict(p.split("=", 1) for p in header.split(",") if "=" in p)
+    try:
+        t = int(parts["t"])
+        signature = parts["v1"]
+    except (KeyError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    if abs(now - t) > tolerance:
+        return False
+    expected = sign_webhook(body, signing_key, timestamp=t).split("v1=", 1)[1]
+    return hmac.compare_digest(expected, signature)
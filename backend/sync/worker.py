@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from ..models.schemas import CalendlyWebhook
+from .client import CalendlyClient
+from .mirror import AvailabilityMirror, parse_date
+from .webhook import BOOKING_EVENTS
+
+
+class CalendlySyncWorker:
+    """
+    Keeps an AvailabilityMirror in step with Calendly:
+    - webhook notifications (invitee.created / invitee.canceled) are applied incrementally
+    - every `reconcile_interval` seconds each event type is re-fetched in full,
+      which repairs any missed or out-of-order notifications
+    Reads go through `ensure_fresh`, which refreshes on demand if the mirror
+    is older than `max_staleness` (e.g. the background loop is failing).
+    """
+
+    def __init__(
+        self,
+        client: CalendlyClient,
+        mirror: AvailabilityMirror,
+        event_types: List[str],
+        reconcile_interval: float = 300.0,
+        max_staleness: float = 900.0,
+        window_days: int = 30,
+        retry_delay: float = 5.0,
+    ):
+        self.client = client
+        self.mirror = mirror
+        self.event_types = list(event_types)
+        self.reconcile_interval = reconcile_interval
+        self.max_staleness = max_staleness
+        self.window_days = window_days
+        self.retry_delay = retry_delay
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Notifications received while a reconcile fetch is in flight; replayed on top of it
+        self._pending: Dict[str, List[CalendlyWebhook]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _lock(self, event_type: str) -> asyncio.Lock:
+        if event_type not in self._locks:
+            self._locks[event_type] = asyncio.Lock()
+        return self._locks[event_type]
+
+    def covers(self, date: str) -> bool:
+        """Whether a clinic-local YYYY-MM-DD date is inside the synced window."""
+        today = datetime.now(self.mirror.tz).date()
+        return today <= parse_date(date) <= today + timedelta(days=self.window_days)
+
+    async def reconcile(self, event_type: str):
+        async with self._lock(event_type):
+            await self._reconcile_locked(event_type)
+
+    async def _reconcile_locked(self, event_type: str):
+        # Upstream filters on its own (UTC) dates; pad a day so clinic-local edges are covered
+        today = datetime.now(self.mirror.tz).date()
+        start_date = (today - timedelta(days=1)).isoformat()
+        end_date = (today + timedelta(days=self.window_days + 1)).isoformat()
+
+        self._pending[event_type] = []
+        try:
+            intervals = await self.client.fetch_busy_times(event_type, start_date, end_date)
+            self.mirror.replace(event_type, intervals)
+            for change in self._pending[event_type]:
+                self._apply(change)
+        finally:
+            del self._pending[event_type]
+
+    async def reconcile_all(self) -> int:
+        """Reconcile every event type; returns the number that failed."""
+        failures = 0
+        for event_type in self.event_types:
+            try:
+                await self.reconcile(event_type)
+            except Exception as e:
+                failures += 1
+                print(f"Calendly sync error for {event_type}: {e}")
+        return failures
+
+    async def ensure_fresh(self, event_type: str):
+        """Make sure the mirror for `event_type` is within `max_staleness`."""
+        if self.mirror.is_fresh(event_type, self.max_staleness):
+            return
+        async with self._lock(event_type):
+            # Another request may have refreshed it while we waited
+            if not self.mirror.is_fresh(event_type, self.max_staleness):
+                await self._reconcile_locked(event_type)
+
+    def handle_webhook(self, notification: CalendlyWebhook) -> bool:
+        """Apply a verified Calendly webhook notification. Returns False if it was ignored."""
+        event_type = notification.payload.event_type
+        if event_type not in self.event_types or notification.event not in BOOKING_EVENTS:
+            return False
+        if event_type in self._pending:
+            self._pending[event_type].append(notification)
+        self._apply(notification)
+        return True
+
+    def record_booking(self, event_type: str, start_time: datetime, end_time: datetime):
+        """Mark a slot booked through this service busy without waiting for upstream."""
+        self.mirror.add_local_booking(event_type, start_time, end_time)
+
+    def _apply(self, notification: CalendlyWebhook):
+        payload = notification.payload
+        if notification.event == "invitee.created":
+            self.mirror.add_busy(payload.event_type, payload.start_time, payload.end_time)
+        else:
+            self.mirror.remove_busy(payload.event_type, payload.start_time, payload.end_time)
+
+    async def run(self):
+        failures = 0
+        while True:
+            if await self.reconcile_all():
+                failures += 1
+                delay = min(self.reconcile_interval, self.retry_delay * 2 ** (failures - 1))
+            else:
+                failures = 0
+                delay = self.reconcile_interval
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
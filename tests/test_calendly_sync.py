@@ -0,0 +1,255 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.api import calendly_integration
+from backend.models.schemas import CalendlyWebhook
+from backend.sync.client import CalendlyClient
+from backend.sync.local_server import LocalCalendlyServer
+from backend.sync.mirror import AvailabilityMirror
+from backend.sync.worker import CalendlySyncWorker
+
+
+DAY = (datetime.now().date() + timedelta(days=1)).isoformat()
+
+
+def at(hh_mm, day=DAY):
+    return datetime.fromisoformat(f"{day}T{hh_mm}")
+
+
+def notify(notification):
+    return CalendlyWebhook.model_validate(notification)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_worker(server, clock=None, timezone="UTC", **kwargs):
+    mirror = AvailabilityMirror(timezone=timezone, clock=clock) if clock else AvailabilityMirror(timezone=timezone)
+    client = CalendlyClient(base_url="http://calendly.local", transport=server.transport())
+    return CalendlySyncWorker(client, mirror, event_types=["general_consultation"], **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_and_webhooks_update_mirror():
+    server = LocalCalendlyServer()
+    server.book("general_consultation", f"{DAY}T09:00:00", f"{DAY}T09:30:00")
+    worker = make_worker(server)
+
+    await worker.reconcile("general_consultation")
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("09:00"), at("09:30"))]
+
+    # Incremental updates need no upstream call
+    requests_before = server.request_count
+    assert worker.handle_webhook(notify(server.book("general_consultation", f"{DAY}T10:00:00", f"{DAY}T10:30:00")))
+    assert worker.handle_webhook(notify(server.cancel("general_consultation", f"{DAY}T09:00:00", f"{DAY}T09:30:00")))
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("10:00"), at("10:30"))]
+    assert server.request_count == requests_before
+
+    assert not worker.handle_webhook(notify(server.book("followup", f"{DAY}T11:00:00", f"{DAY}T11:15:00")))
+
+
+@pytest.mark.asyncio
+async def test_utc_times_are_mirrored_in_clinic_time():
+    clinic = ZoneInfo("America/New_York")
+
+    def utc(local):
+        return local.replace(tzinfo=clinic).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    server = LocalCalendlyServer()
+    server.book("general_consultation", utc(at("10:00")), utc(at("10:30")))
+    # 22:00 in New York is already the next day in UTC
+    server.book("general_consultation", utc(at("22:00")), utc(at("22:30")))
+    worker = make_worker(server, timezone="America/New_York")
+
+    await worker.reconcile("general_consultation")
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("10:00"), at("10:30")), (at("22:00"), at("22:30"))]
+
+    worker.handle_webhook(notify(server.cancel("general_consultation", utc(at("10:00")), utc(at("10:30")))))
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("22:00"), at("22:30"))]
+
+
+def test_local_bookings_survive_replace_until_reported_or_ended():
+    mirror = AvailabilityMirror()
+    past = (datetime.now().date() - timedelta(days=1)).isoformat()
+    mirror.add_local_booking("general_consultation", at("13:00"), at("13:30"))
+    mirror.add_local_booking("general_consultation", at("09:00", past), at("09:30", past))
+
+    mirror.replace("general_consultation", [])
+    assert mirror.busy_on("general_consultation", DAY) == [(at("13:00"), at("13:30"))]
+    assert mirror.busy_on("general_consultation", past) == []  # already over
+
+    # Once upstream reports it, a later cancellation frees the slot
+    mirror.replace("general_consultation", [(f"{DAY}T13:00:00", f"{DAY}T13:30:00")])
+    mirror.replace("general_consultation", [])
+    assert mirror.busy_on("general_consultation", DAY) == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_dropped_webhook():
+    server = LocalCalendlyServer()
+    worker = make_worker(server)
+    await worker.reconcile("general_consultation")
+
+    server.book("general_consultation", f"{DAY}T13:00:00", f"{DAY}T13:30:00")  # notification lost
+    assert worker.mirror.busy_on("general_consultation", DAY) == []
+
+    await worker.reconcile_all()
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("13:00"), at("13:30"))]
+
+
+@pytest.mark.asyncio
+async def test_webhook_during_reconcile_is_not_lost():
+    server = LocalCalendlyServer(latency=0.05)
+    worker = make_worker(server)
+
+    reconcile = asyncio.create_task(worker.reconcile("general_consultation"))
+    await asyncio.sleep(0.01)  # upstream snapshot already taken, response in flight
+    worker.handle_webhook(notify(server.book("general_consultation", f"{DAY}T14:00:00", f"{DAY}T14:30:00")))
+    await reconcile
+
+    assert (at("14:00"), at("14:30")) in worker.mirror.busy_on("general_consultation", DAY)
+
+
+@pytest.mark.asyncio
+async def test_ensure_fresh_bounds_staleness():
+    clock = FakeClock()
+    server = LocalCalendlyServer()
+    worker = make_worker(server, clock=clock, max_staleness=60)
+
+    await worker.ensure_fresh("general_consultation")
+    assert server.request_count == 1
+
+    clock.now = 30
+    await worker.ensure_fresh("general_consultation")
+    assert server.request_count == 1
+
+    clock.now = 61
+    await worker.ensure_fresh("general_consultation")
+    assert server.request_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stale_reads_share_one_refresh():
+    server = LocalCalendlyServer(latency=0.05)
+    worker = make_worker(server)
+
+    await asyncio.gather(*[worker.ensure_fresh("general_consultation") for _ in range(5)])
+    assert server.request_count == 1
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_keeps_previous_mirror():
+    server = LocalCalendlyServer()
+    server.book("general_consultation", f"{DAY}T09:00:00", f"{DAY}T09:30:00")
+    worker = make_worker(server)
+    await worker.reconcile("general_consultation")
+
+    server.fail_next()
+    assert await worker.reconcile_all() == 1
+    assert worker.mirror.busy_on("general_consultation", DAY) == [(at("09:00"), at("09:30"))]
+
+
+def test_availability_endpoint_serves_from_mirror():
+    server = LocalCalendlyServer()
+    server.book("general_consultation", f"{DAY}T09:00:00", f"{DAY}T09:30:00")
+    server.book("general_consultation", f"{DAY}T11:00:00.000000Z", f"{DAY}T11:30:00.000000Z")
+    worker = make_worker(server)
+    calendly_integration.set_sync_worker(worker, webhook_signing_key=server.signing_key)
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/calendly/availability", params={"date": DAY, "appointment_type": "general_consultation"})
+        assert resp.status_code == 200
+        slots = {s["start_time"]: s["available"] for s in resp.json()["available_slots"]}
+        assert slots["09:00"] is False and slots["11:00"] is False
+        assert all(slots[t] for t in slots if t not in ("09:00", "11:00"))
+
+        body, headers = server.sign(server.book("general_consultation", f"{DAY}T09:45:00", f"{DAY}T10:15:00"))
+        resp = client.post("/api/calendly/webhook", content=body, headers=headers)
+        assert resp.json()["status"] == "applied"
+        resp = client.get("/api/calendly/availability", params={"date": DAY, "appointment_type": "general_consultation"})
+        slots = {s["start_time"]: s["available"] for s in resp.json()["available_slots"]}
+        assert slots["09:30"] is False and slots["10:00"] is False and slots["10:30"] is True
+
+        booking = {
+            "appointment_type": "general_consultation",
+            "date": DAY,
+            "start_time": "13:00",
+            "patient": {"name": "Test Patient", "email": "test@example.com", "phone": "+1-555-0000"},
+            "reason": "Checkup",
+        }
+        assert client.post("/api/calendly/book", json=booking).status_code == 200
+        assert (at("13:00"), at("13:30")) in worker.mirror.busy_on("general_consultation", DAY)
+        assert client.post("/api/calendly/book", json=booking).status_code == 409
+        assert client.post("/api/calendly/book", json={**booking, "start_time": "13:15"}).status_code == 409
+        assert client.post("/api/calendly/book", json={**booking, "date": DAY.replace("-", "")}).status_code == 400
+        assert client.post("/api/calendly/book", json={**booking, "start_time": "1300"}).status_code == 400
+
+        # A full reconcile (upstream does not know the booking yet) must not free the slot
+        worker.max_staleness = -1
+        assert client.post("/api/calendly/book", json=booking).status_code == 409
+        assert worker.mirror.busy_on("general_consultation", DAY)[-1] == (at("13:00"), at("13:30"))
+        worker.max_staleness = 900
+
+        # Outside the synced window the mirror knows nothing, so it must not claim slots are free
+        far = (datetime.now().date() + timedelta(days=45)).isoformat()
+        past = (datetime.now().date() - timedelta(days=2)).isoformat()
+        for date in (far, past, "not-a-date", DAY.replace("-", ""), f"{DAY}T23:00", "2026-W43-2"):
+            resp = client.get("/api/calendly/availability", params={"date": date, "appointment_type": "general_consultation"})
+            assert resp.status_code == 400
+
+        server.fail_next(10)
+        worker.max_staleness = -1  # force a refresh that will fail
+        resp = client.get("/api/calendly/availability", params={"date": DAY, "appointment_type": "general_consultation"})
+        assert resp.status_code == 503
+    finally:
+        calendly_integration.set_sync_worker(None)
+
+
+def test_webhook_rejects_unsigned_and_malformed_notifications():
+    server = LocalCalendlyServer()
+    server.book("general_consultation", f"{DAY}T09:00:00", f"{DAY}T09:30:00")
+    worker = make_worker(server)
+    calendly_integration.set_sync_worker(worker, webhook_signing_key=server.signing_key)
+    try:
+        client = TestClient(app)
+        forged = {
+            "event": "invitee.canceled",
+            "payload": {"event_type": "general_consultation", "start_time": f"{DAY}T09:00:00", "end_time": f"{DAY}T09:30:00"},
+        }
+        resp = client.post("/api/calendly/webhook", json=forged)
+        assert resp.status_code == 401
+        body, headers = server.sign(forged)
+        headers["Calendly-Webhook-Signature"] = headers["Calendly-Webhook-Signature"][:-4] + "0000"
+        assert client.post("/api/calendly/webhook", content=body, headers=headers).status_code == 401
+
+        bad = [
+            {"event": "invitee.created", "payload": {"event_type": "general_consultation", "start_time": f"{DAY}Tjunk", "end_time": f"{DAY}T10:00:00"}},
+            {"event": "invitee.created", "payload": None},
+            {"event": "invitee.created", "payload": {"event_type": "general_consultation"}},
+            {"event": "invitee.created", "payload": {"event_type": "general_consultation", "start_time": f"{DAY}T10:00:00", "end_time": f"{DAY}T09:00:00"}},
+        ]
+        for notification in bad:
+            body, headers = server.sign(notification)
+            assert client.post("/api/calendly/webhook", content=body, headers=headers).status_code == 422
+
+        body, headers = server.sign({"event": "routing_form_submission.created", "payload": {}})
+        assert client.post("/api/calendly/webhook", content=body, headers=headers).json()["status"] == "ignored"
+
+        resp = client.get("/api/calendly/availability", params={"date": DAY, "appointment_type": "general_consultation"})
+        assert resp.status_code == 200
+        assert worker.mirror.busy_on("general_consultation", DAY) == [(at("09:00"), at("09:30"))]
+
+        calendly_integration.set_sync_worker(worker, webhook_signing_key=None)
+        body, headers = server.sign(forged)
+        assert client.post("/api/calendly/webhook", content=body, headers=headers).status_code == 503
+    finally:
+        calendly_integration.set_sync_worker(None)
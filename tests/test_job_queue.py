@@ -0,0 +1,328 @@
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+
+from backend.agent.scheduling_agent import SchedulingAgent
+from backend.jobs.post_booking import (
+    AUDIT_LOG,
+    SEND_CONFIRMATION,
+    SEND_REMINDER,
+    AuditLog,
+    enqueue_post_booking,
+    register_post_booking_handlers,
+)
+from backend.jobs.queue import JobQueue
+from backend.jobs.worker import JobWorkerPool
+from backend.models.schemas import BookingResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingNotifier:
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+
+    async def send_batch(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("SMTP unavailable")
+        self.batches.append(messages)
+
+
+class FakeBookingTool:
+    async def book(self, payload):
+        return make_booking(payload.date, payload.start_time, payload.patient.email)
+
+
+def make_booking(date, start_time, email="test@example.com", booking_id="APPT-1"):
+    return BookingResponse(
+        booking_id=booking_id,
+        status="confirmed",
+        confirmation_code="CONF-123456",
+        details={
+            "appointment_type": "general_consultation",
+            "date": date,
+            "start_time": start_time,
+            "patient": {"name": "Test Patient", "email": email, "phone": "+1-555-0000"},
+            "reason": "Checkup",
+        },
+    )
+
+
+def test_queue_is_durable(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path)
+    queue.enqueue("send_confirmation", {"to": "a@example.com"})
+    queue.close()
+
+    reopened = JobQueue(path)
+    jobs = reopened.claim_batch({"send_confirmation": 10})
+    assert [j.payload for j in jobs] == [{"to": "a@example.com"}]
+    assert jobs[0].attempts == 1
+
+
+def test_claim_batches_one_kind_and_respects_delay():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    for i in range(5):
+        queue.enqueue("notify", {"n": i})
+    queue.enqueue("audit", {"n": 99})
+    queue.enqueue("notify", {"n": 100}, delay=60)
+
+    batch = queue.claim_batch({"notify": 3, "audit": 10})
+    assert [j.payload["n"] for j in batch] == [0, 1, 2]
+    batch = queue.claim_batch({"notify": 3, "audit": 10})
+    assert [j.payload["n"] for j in batch] == [3, 4]
+    batch = queue.claim_batch({"notify": 3, "audit": 10})
+    assert [j.payload["n"] for j in batch] == [99]
+    assert queue.claim_batch({"notify": 3, "audit": 10}) == []
+
+    clock.now += 61
+    assert [j.payload["n"] for j in queue.claim_batch({"notify": 3})] == [100]
+
+
+def test_metrics_report_queue_depth():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    queue.enqueue("notify", {})
+    queue.enqueue("notify", {})
+    queue.enqueue("audit", {}, delay=3600)
+    clock.now += 10
+
+    queue.complete([j.id for j in queue.claim_batch({"notify": 1})])
+    m = queue.metrics()
+    assert (m.pending, m.running, m.done, m.failed) == (2, 0, 1, 0)
+    assert m.due == 1
+    assert m.oldest_due_age_seconds == 10
+    assert m.pending_by_kind == {"notify": 1, "audit": 1}
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_retries_with_backoff_then_gives_up():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    pool = JobWorkerPool(queue, base_backoff=10, max_backoff=15)
+    notifier = RecordingNotifier(failures=10)
+
+    async def handler(jobs):
+        await notifier.send_batch([j.payload for j in jobs])
+
+    pool.register("notify", handler, batch_size=10)
+    queue.enqueue("notify", {"to": "a@example.com"}, max_attempts=3)
+
+    assert await pool.run_once() == 1
+    assert await pool.run_once() == 0  # backing off for 10s
+    clock.now += 10
+    assert await pool.run_once() == 1
+    clock.now += 10
+    assert await pool.run_once() == 0  # second backoff is 20s, capped at 15s
+    clock.now += 5
+    assert await pool.run_once() == 1
+
+    m = queue.metrics()
+    assert (m.pending, m.failed) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_requeue_stale_running_jobs():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    queue.enqueue("notify", {})
+    queue.claim_batch({"notify": 1})  # worker dies before completing
+
+    assert queue.requeue_stale(timeout=60) == 0
+    clock.now += 61
+    assert queue.requeue_stale(timeout=60) == 1
+    assert len(queue.claim_batch({"notify": 1})) == 1
+
+
+def test_requeue_stale_gives_up_after_max_attempts():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    queue.enqueue("notify", {}, max_attempts=2)
+
+    for _ in range(2):
+        assert len(queue.claim_batch({"notify": 1})) == 1  # worker crashes every time
+        clock.now += 61
+        queue.requeue_stale(timeout=60)
+
+    m = queue.metrics()
+    assert (m.pending, m.running, m.failed) == (0, 0, 1)
+    assert queue.claim_batch({"notify": 1}) == []
+
+
+@pytest.mark.asyncio
+async def test_long_batch_is_heartbeated_not_reclaimed():
+    queue = JobQueue(":memory:")
+    pool = JobWorkerPool(queue, stale_timeout=0.15, handler_timeout=5)
+    calls = []
+
+    async def slow_handler(jobs):
+        calls.append(jobs)
+        await asyncio.sleep(0.4)  # well past stale_timeout
+
+    pool.register("notify", slow_handler)
+    queue.enqueue("notify", {})
+
+    async def other_worker():
+        await asyncio.sleep(0.3)
+        queue.requeue_stale(pool.stale_timeout)
+        return await pool.run_once()
+
+    handled, reclaimed = await asyncio.gather(pool.run_once(), other_worker())
+    assert (handled, reclaimed) == (1, 0)
+    assert len(calls) == 1
+    assert queue.metrics().done == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_in_flight_batch():
+    queue = JobQueue(":memory:")
+    pool = JobWorkerPool(queue, concurrency=1, poll_interval=0.01)
+    started = asyncio.Event()
+
+    async def slow_handler(jobs):
+        started.set()
+        await asyncio.sleep(10)
+
+    pool.register("notify", slow_handler)
+    queue.enqueue("notify", {}, max_attempts=1)
+    pool.start()
+    await started.wait()
+    await pool.stop()
+
+    m = queue.metrics()
+    assert (m.pending, m.running, m.failed) == (1, 0, 0)
+    jobs = queue.claim_batch({"notify": 1})
+    assert len(jobs) == 1 and jobs[0].attempts == 1  # the interrupted attempt was not counted
+
+
+@pytest.mark.asyncio
+async def test_hung_handler_times_out_as_failure():
+    clock = FakeClock()
+    queue = JobQueue(":memory:", clock=clock)
+    pool = JobWorkerPool(queue, handler_timeout=0.05, base_backoff=10)
+
+    async def hung_handler(jobs):
+        await asyncio.sleep(10)
+
+    pool.register("notify", hung_handler)
+    queue.enqueue("notify", {}, max_attempts=1)
+
+    assert await pool.run_once() == 1
+    m = queue.metrics()
+    assert (m.running, m.failed) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_post_booking_jobs_are_batched(tmp_path):
+    queue = JobQueue(":memory:")
+    pool = JobWorkerPool(queue)
+    notifier = RecordingNotifier()
+    audit_path = tmp_path / "audit.log"
+    register_post_booking_handlers(pool, notifier, AuditLog(str(audit_path)))
+
+    soon = (datetime.now() + timedelta(hours=2)).strftime("%Y-%m-%d %H:%M").split()
+    later = (datetime.now() + timedelta(days=3)).date().isoformat()
+    enqueue_post_booking(queue, make_booking(soon[0], soon[1], booking_id="APPT-1"))
+    enqueue_post_booking(queue, make_booking(later, "10:00", booking_id="APPT-2"))
+
+    assert queue.metrics().pending_by_kind == {SEND_CONFIRMATION: 2, AUDIT_LOG: 2, SEND_REMINDER: 1}
+
+    await pool.drain()
+    # Both confirmations go out in a single provider call; the reminder waits until a day before
+    assert len(notifier.batches) == 1
+    assert [m["template"] for m in notifier.batches[0]] == ["confirmation", "confirmation"]
+    entries = [json.loads(line) for line in audit_path.read_text().splitlines()]
+    assert [e["booking_id"] for e in entries] == ["APPT-1", "APPT-2"]
+    assert queue.metrics().pending_by_kind == {SEND_REMINDER: 1}
+
+
+@pytest.mark.parametrize("timezone", ["Pacific/Kiritimati", "Pacific/Pago_Pago"])
+def test_reminder_delay_uses_clinic_time(timezone):
+    # UTC+14 and UTC-11: whichever the host zone is, at least one is far from it
+    clinic_now = datetime.now(ZoneInfo(timezone)).replace(tzinfo=None, second=0, microsecond=0)
+    clock = FakeClock()
+    clock.now = time.time()
+    queue = JobQueue(":memory:", clock=clock)
+
+    soon = clinic_now + timedelta(hours=23)
+    enqueue_post_booking(queue, make_booking(soon.date().isoformat(), soon.strftime("%H:%M")), timezone=timezone)
+    assert SEND_REMINDER not in queue.metrics().pending_by_kind
+
+    # Reminder for an appointment 30h ahead is due 6h from now
+    later = clinic_now + timedelta(hours=30)
+    enqueue_post_booking(queue, make_booking(later.date().isoformat(), later.strftime("%H:%M")), timezone=timezone)
+    clock.now += 6 * 3600 - 120
+    assert queue.claim_batch({SEND_REMINDER: 1}) == []
+    clock.now += 240
+    assert len(queue.claim_batch({SEND_REMINDER: 1})) == 1
+
+
+@pytest.mark.asyncio
+async def test_finalize_booking_only_enqueues_side_effects():
+    queue = JobQueue(":memory:")
+    agent = SchedulingAgent(faq_rag=None, availability_tool=None, booking_tool=FakeBookingTool(), job_queue=queue)
+
+    resp = await agent.finalize_booking(
+        appointment_type="general_consultation",
+        date="2030-01-15",
+        start_time="09:00",
+        patient_name="Test Patient",
+        patient_email="test@example.com",
+        patient_phone="+1-555-0000",
+        reason="Checkup",
+    )
+    assert resp.state["intent"] == "BOOKED"
+    m = queue.metrics()
+    assert m.done == 0
+    assert m.pending_by_kind == {SEND_CONFIRMATION: 1, AUDIT_LOG: 1, SEND_REMINDER: 1}
+
+
+@pytest.mark.asyncio
+async def test_locked_queue_does_not_block_event_loop(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path, busy_timeout=0.3)
+    agent = SchedulingAgent(faq_rag=None, availability_tool=None, booking_tool=FakeBookingTool(), job_queue=queue)
+    # Another process holding the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    gaps = []
+
+    async def ticker():
+        last = time.monotonic()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            gaps.append(time.monotonic() - last)
+            last = time.monotonic()
+
+    try:
+        _, resp = await asyncio.gather(
+            ticker(),
+            agent.finalize_booking(
+                appointment_type="general_consultation",
+                date="2030-01-15",
+                start_time="09:00",
+                patient_name="Test Patient",
+                patient_email="test@example.com",
+                patient_phone="+1-555-0000",
+                reason="Checkup",
+            ),
+        )
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    # The slot is still booked; other coroutines kept running while the insert waited
+    assert resp.state["intent"] == "BOOKED"
+    assert max(gaps) < 0.2